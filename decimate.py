@@ -1,166 +1,619 @@
-import bpy
 import os
+import re
+import sys
+import subprocess
+import tempfile
+import mmap
 import argparse
 import shutil
+import functools
+import collections
+import multiprocessing
+import concurrent.futures
 import numpy as np
-from mathutils import Vector
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
-def process_stl(input_path, output_path, decimation_ratio, resize_factor):
-    bpy.ops.object.select_all(action='DESELECT')
-    bpy.ops.object.select_by_type(type='MESH')
-    bpy.ops.object.delete()
 
-    bpy.ops.import_mesh.stl(filepath=input_path)
+# bpy is imported where it is used, so runs that only copy
+# files never pay for starting Blender
+
+# Binary STL layout: 80 byte header, uint32 triangle count, then 50 bytes per triangle
+STL_HEADER_SIZE = 84
+STL_TRIANGLE_DTYPE = np.dtype([('normal', '<f4', (3,)), ('vertices', '<f4', (3, 3)), ('attribute', '<u2')])
+STL_ASCII_VERTEX = re.compile(rb"vertex\s+(\S+)\s+(\S+)\s+(\S+)")
+STL_EXPORT_HEADER = b"Exported from Blender by batch-edit-stls".ljust(80, b" ")
+WRITE_BUFFER_SIZE = 1 << 20
+
+# How many upcoming input files are read ahead, and how many finished meshes may wait to be written
+PREFETCH_DEPTH = 2
+WRITE_QUEUE_DEPTH = 2
+
+# Meshes per stacked eigh call in the batched OBB path; only one group's vertices are held at a time
+OBB_GROUP_SIZE = 256
+
+FLOAT64_EPS = np.finfo(np.float64).eps
+
+
+def jit(**options):
+    # Compile with Numba when it is installed; otherwise the function runs as plain Python/NumPy
+    def decorate(func):
+        if njit is None:
+            return func
+        return njit(cache=True, **options)(func)
+    return decorate
+
 
-    if bpy.context.selected_objects:
-        bpy.context.view_layer.objects.active = bpy.context.selected_objects[0]
+def setup_blender():
+    import bpy
 
-        # Apply the decimation modifier if ratio is provided
-        if decimation_ratio is not None:
-            bpy.ops.object.modifier_add(type='DECIMATE')
-            bpy.context.object.modifiers["Decimate"].ratio = decimation_ratio
+    # Undo steps are never used in a batch run and only slow every operator down
+    bpy.context.preferences.edit.use_global_undo = False
+    bpy.context.scene.render.use_lock_interface = True
 
-        # Apply resizing if resize factor is provided
-        if resize_factor is not None:
-            bpy.ops.transform.resize(value=(resize_factor, resize_factor, resize_factor))
+    # Nothing should react to scene changes while the batch runs
+    bpy.app.handlers.depsgraph_update_pre.clear()
+    bpy.app.handlers.depsgraph_update_post.clear()
+    clear_scene()
 
-        # Convert the object to apply the modifiers
-        bpy.ops.object.convert(target='MESH')
 
-        # Export the processed mesh to STL
-        bpy.ops.export_mesh.stl(filepath=output_path)
+def clear_scene():
+    import bpy
 
+    # Free the datablocks directly instead of going through the select/delete operators
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for mesh in list(bpy.data.meshes):
+        bpy.data.meshes.remove(mesh)
+
+    # Drop anything else the last file left behind so the datablock lists don't grow over the batch
+    bpy.data.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
+
+
+def import_stl(input_path, decimation_ratio, resize_factor):
+    import bpy
+
+    clear_scene()
+    bpy.ops.import_mesh.stl(filepath=input_path)
+    if not bpy.context.selected_objects:
+        return None
+
+    obj = bpy.context.selected_objects[0]
+    bpy.context.view_layer.objects.active = obj
+
+    # Apply the decimation modifier if ratio is provided
+    if decimation_ratio is not None:
+        modifier = obj.modifiers.new(name="Decimate", type='DECIMATE')
+        modifier.ratio = decimation_ratio
+        bpy.ops.object.modifier_apply(modifier=modifier.name)
+
+    # Apply resizing if resize factor is provided
+    if resize_factor is not None:
+        # Scale the object directly rather than through the resize operator
+        obj.scale = obj.scale * resize_factor
+        # Nothing else evaluates the scene now, so refresh matrix_world before it is read
+        bpy.context.view_layer.update()
+
+    return obj
+
+
+def get_vertex_coords(mesh):
+    # Copy every vertex coordinate out in one C-level call instead of iterating over the vertices in Python
+    n = len(mesh.vertices)
+    co = np.empty(n * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    return co.reshape(n, 3)
+
+
+def export_stl(obj, output_path, write=None):
+    # Pull the triangulated mesh out in bulk and write it ourselves instead of using the export operator
+    mesh = obj.data
+    mesh.calc_loop_triangles()
+    indices = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", indices)
+
+    matrix = np.array(obj.matrix_world, dtype=np.float32)
+    verts = get_vertex_coords(mesh) @ matrix[:3, :3].T + matrix[:3, 3]
+
+    (write or write_stl)(output_path, verts[indices.reshape(-1, 3)])
+
+
+@jit()
+def eigh3(cov_matrix):
+    # Closed-form eigendecomposition of a symmetric 3x3 matrix, which is far cheaper than a LAPACK call
+    # at this size. Like np.linalg.eigh, eigenvalues are ascending and eigenvectors are the columns.
+    # Written with the subset of NumPy that Numba supports so obb_dims can call it.
+    c = np.asarray(cov_matrix, dtype=np.float64)
+    p1 = c[0, 1] ** 2 + c[0, 2] ** 2 + c[1, 2] ** 2
+    q = (c[0, 0] + c[1, 1] + c[2, 2]) / 3
+    p2 = (c[0, 0] - q) ** 2 + (c[1, 1] - q) ** 2 + (c[2, 2] - q) ** 2 + 2 * p1
+    p = np.sqrt(p2 / 6)
+    if p <= FLOAT64_EPS * max(abs(q), 1e-300):
+        # All three eigenvalues are equal, so any orthonormal basis will do
+        return np.full(3, q), np.eye(3)
+
+    b = (c - q * np.eye(3)) / p
+    det_b = (b[0, 0] * (b[1, 1] * b[2, 2] - b[1, 2] * b[2, 1])
+             - b[0, 1] * (b[1, 0] * b[2, 2] - b[1, 2] * b[2, 0])
+             + b[0, 2] * (b[1, 0] * b[2, 1] - b[1, 1] * b[2, 0]))
+    phi = np.arccos(min(max(det_b / 2, -1.0), 1.0)) / 3
+    largest = q + 2 * p * np.cos(phi)
+    smallest = q + 2 * p * np.cos(phi + 2 * np.pi / 3)
+    middle = 3 * q - largest - smallest
+
+    # Take the eigenvector of whichever eigenvalue is furthest from the middle one from the null space of
+    # (C - lambda * I), using the cross product of its two most independent rows
+    separated = largest if largest - middle >= middle - smallest else smallest
+    rows = c - separated * np.eye(3)
+    v = np.cross(rows[0], rows[1])
+    for candidate in (np.cross(rows[0], rows[2]), np.cross(rows[1], rows[2])):
+        if np.sum(candidate * candidate) > np.sum(v * v):
+            v = candidate
+    v = v / np.sqrt(np.sum(v * v))
+
+    # The other two eigenvectors span the plane orthogonal to v, where the problem reduces to a 2x2 rotation
+    u = np.cross(v, np.eye(3)[np.argmin(np.abs(v))])
+    u = u / np.sqrt(np.sum(u * u))
+    w = np.cross(v, u)
+    uw = np.sum(c * u.reshape(3, 1) * w.reshape(1, 3))
+    uu = np.sum(c * u.reshape(3, 1) * u.reshape(1, 3))
+    ww = np.sum(c * w.reshape(3, 1) * w.reshape(1, 3))
+    theta = 0.5 * np.arctan2(2 * uw, uu - ww)
+    upper = np.cos(theta) * u + np.sin(theta) * w
+    lower = np.cross(v, upper)
+
+    eigvals = np.array([smallest, middle, largest])
+    if separated == largest:
+        eigvecs = np.column_stack((lower, upper, v))
     else:
-        print(f"Skipping {input_path}: No valid mesh data found.")
+        eigvecs = np.column_stack((v, lower, upper))
+    return eigvals, eigvecs
+
+
+@jit(fastmath=True)
+def obb_dims(verts, linear):
+    # The whole OBB pipeline as explicit loops for Numba to compile into one kernel. Only called when Numba
+    # is installed; the rotation and the min/max reduction share a single pass, so no rotated copy is made.
+    # verts are local coordinates and linear is the 3x3 part of the world matrix, applied analytically.
+    n = verts.shape[0]
+    mean = np.zeros(3)
+    for i in range(n):
+        for j in range(3):
+            mean[j] += verts[i, j]
+    mean /= n
+
+    local_cov = np.zeros((3, 3))
+    for i in range(n):
+        for j in range(3):
+            dj = verts[i, j] - mean[j]
+            for k in range(j, 3):
+                local_cov[j, k] += dj * (verts[i, k] - mean[k])
+    for j in range(3):
+        for k in range(j):
+            local_cov[j, k] = local_cov[k, j]
+    local_cov /= n - 1
+
+    cov_matrix = np.zeros((3, 3))
+    for j in range(3):
+        for k in range(3):
+            for a in range(3):
+                for b in range(3):
+                    cov_matrix[j, k] += linear[j, a] * local_cov[a, b] * linear[k, b]
+
+    # eigh3 sorts eigenvalues in ascending order, so read its columns last to first
+    eigvals, eigvecs = eigh3(cov_matrix)
+    projection = np.zeros((3, 3))
+    for a in range(3):
+        for j in range(3):
+            for b in range(3):
+                projection[a, j] += linear[b, a] * eigvecs[b, 2 - j]
+
+    min_coords = np.empty(3)
+    max_coords = np.empty(3)
+    for i in range(n):
+        for j in range(3):
+            r = verts[i, 0] * projection[0, j] + verts[i, 1] * projection[1, j] + verts[i, 2] * projection[2, j]
+            if i == 0 or r < min_coords[j]:
+                min_coords[j] = r
+            if i == 0 or r > max_coords[j]:
+                max_coords[j] = r
+    return max_coords - min_coords
 
 
 def get_oriented_bounding_box(obj):
-    # Convert object to numpy array of vertices
-    verts = np.array([obj.matrix_world @ Vector(v.co) for v in obj.data.vertices])
+    # Stay in local coordinates rather than moving every vertex to world space. The covariance ignores
+    # translation, so for the world matrix's linear part A the world covariance is A @ C @ A.T, and projecting
+    # the local vertices onto A.T @ eigvecs gives the world-space extents. The vertex arrays stay in float32
+    # like the STL data itself; only the 3x3 math runs in float64.
+    co = get_vertex_coords(obj.data)
+    n = len(co)
+    linear = np.array(obj.matrix_world, dtype=np.float64)[:3, :3]
+    if njit is not None:
+        return obb_dims(co, linear)
 
     # Compute the covariance matrix and eigenvectors
-    cov_matrix = np.cov(verts.T)
-    eigvals, eigvecs = np.linalg.eigh(cov_matrix)
+    centered = co - co.mean(axis=0)
+    cov_matrix = linear @ (centered.T @ centered).astype(np.float64) @ linear.T / (n - 1)
+    eigvals, eigvecs = eigh3(cov_matrix)
 
     # Sort eigenvectors by eigenvalues
     order = eigvals.argsort()[::-1]
     eigvecs = eigvecs[:, order]
 
     # Rotate the vertices to the principal component frame
-    rotated_verts = verts @ eigvecs
-
-    # Find the minimum and maximum points in the principal component frame
-    min_coords = rotated_verts.min(axis=0)
-    max_coords = rotated_verts.max(axis=0)
+    rotated_verts = co @ (linear.T @ eigvecs).astype(np.float32)
 
     # Compute dimensions in the principal component frame
-    dimensions = max_coords - min_coords
+    dimensions = np.ptp(rotated_verts, axis=0)
 
     return dimensions
 
 
 def get_axis_aligned_bounding_box(obj):
-    local_coords = np.array([v.co for v in obj.data.vertices])
-    dimensions = local_coords.max(axis=0) - local_coords.min(axis=0)
+    local_coords = get_vertex_coords(obj.data)
+    dimensions = np.ptp(local_coords, axis=0)
     return dimensions
 
 
-def process_and_write_dimensions(input_directory, output_directory, decimation_ratio, resize_factor, prepend_str, append_str, recursive, dimensions_flag, dimension_method):
-    use_blender = decimation_ratio is not None or resize_factor is not None
-    dimension_lines = []
-
-    if recursive:
-        for root, dirs, files in os.walk(input_directory):
-            for filename in files:
-                if filename.endswith(".stl"):
-                    input_path = os.path.join(root, filename)
-                    relative_path = os.path.relpath(input_path, input_directory)
-                    output_path = os.path.join(output_directory, relative_path)
-                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                    base_filename, ext = os.path.splitext(filename)
-                    if prepend_str is not None:
-                        base_filename = prepend_str + base_filename
-                    if append_str is not None:
-                        base_filename = base_filename + append_str
-                    new_output_path = os.path.join(os.path.dirname(output_path), base_filename + ext)
-
-                    bpy.ops.object.select_all(action='DESELECT')
-                    bpy.ops.object.select_by_type(type='MESH')
-                    bpy.ops.object.delete()
-                    bpy.ops.import_mesh.stl(filepath=input_path)
-                    if bpy.context.selected_objects:
-                        obj = bpy.context.selected_objects[0]
-
-                        # Apply the modifications
-                        if use_blender:
-                            if decimation_ratio is not None:
-                                bpy.ops.object.modifier_add(type='DECIMATE')
-                                bpy.context.object.modifiers["Decimate"].ratio = decimation_ratio
-                            if resize_factor is not None:
-                                bpy.ops.transform.resize(value=(resize_factor, resize_factor, resize_factor))
-                            bpy.ops.object.convert(target='MESH')
-
-                        # Compute dimensions based on the chosen method
-                        if dimension_method == "obb":
-                            dimensions = get_oriented_bounding_box(obj)
-                        else:
-                            dimensions = get_axis_aligned_bounding_box(obj) * (resize_factor if resize_factor is not None else 1)
-
-                        dimension_lines.append(f"{filename}: {dimensions[0]:.3f}, {dimensions[1]:.3f}, {dimensions[2]:.3f}")
-
-                        if use_blender:
-                            process_stl(input_path, new_output_path, decimation_ratio, resize_factor)
-                        else:
-                            shutil.copy(input_path, new_output_path)
+def read_stl_vertices(path):
+    # Read the triangle corners straight from the file, without going through Blender's importer
+    size = os.path.getsize(path)
+    if size == 0:
+        return np.empty((0, 3), dtype=np.float32)
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        if size >= STL_HEADER_SIZE:
+            count = int(np.frombuffer(buf, dtype='<u4', count=1, offset=80)[0])
+            if size == STL_HEADER_SIZE + count * STL_TRIANGLE_DTYPE.itemsize:
+                triangles = np.frombuffer(buf, dtype=STL_TRIANGLE_DTYPE, count=count, offset=STL_HEADER_SIZE)
+                verts = np.array(triangles['vertices'], dtype=np.float32).reshape(-1, 3)
+                del triangles
+                return verts
+
+        # The size doesn't match a binary STL, so fall back to parsing it as ASCII
+        verts = np.array(STL_ASCII_VERTEX.findall(buf), dtype=np.float32).reshape(-1, 3)
+        return verts
+
+
+def write_stl(path, triangles):
+    # triangles is a (T, 3, 3) array of corner positions, written out as a binary STL
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    np.divide(normals, lengths, out=normals, where=lengths > 0)
+
+    data = np.zeros(len(triangles), dtype=STL_TRIANGLE_DTYPE)
+    data['normal'] = normals
+    data['vertices'] = triangles
+
+    # Buffer the header and hand the triangle records over in one write instead of one per triangle.
+    # Writing to a temporary name first means a half-written file never appears under the real name.
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(STL_EXPORT_HEADER)
+            f.write(np.uint32(len(data)).astype('<u4').tobytes())
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Don't leave a partial temporary file behind in the output tree
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def prefetch_file(path):
+    # Read the file once so it is already in the page cache when it is imported
+    buf = bytearray(WRITE_BUFFER_SIZE)
+    try:
+        with open(path, 'rb', buffering=0) as f:
+            while f.readinto(buf):
+                pass
+    except OSError:
+        # Leave reporting the problem to the real read
+        pass
+
+
+def iter_stl_files(input_directory, recursive):
+    # scandir's entries cache the file type, so this avoids the extra stat calls os.walk makes
+    stack = [input_directory]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(entry.path)
+                elif entry.is_file() and entry.name.endswith(".stl"):
+                    yield entry.path
+
+
+def get_output_path(input_path, input_directory, output_directory, prepend_str, append_str):
+    relative_path = os.path.relpath(input_path, input_directory)
+    output_path = os.path.join(output_directory, relative_path)
+    base_filename, ext = os.path.splitext(os.path.basename(output_path))
+    if prepend_str is not None:
+        base_filename = prepend_str + base_filename
+    if append_str is not None:
+        base_filename = base_filename + append_str
+    return os.path.join(os.path.dirname(output_path), base_filename + ext)
+
+
+def process_file(input_path, output_path, decimation_ratio, resize_factor, dimension_method, write=None):
+    # dimension_method is None when no dimensions were requested. write replaces write_stl for the output,
+    # so process_batch can hand it to a background thread.
+    filename = os.path.basename(input_path)
+    dimensions = None
+
+    if decimation_ratio is None:
+        # Nothing here needs Blender, so work on the triangles read straight from the file.
+        # OBB runs without decimation go through get_batched_oriented_bounding_boxes instead.
+        verts = read_stl_vertices(input_path)
+        if len(verts) == 0:
+            return None
+        copy_or_resize(input_path, output_path, verts, resize_factor, write)
+        if dimension_method is not None:
+            dimensions = np.ptp(verts, axis=0)
 
     else:
-        files = [f for f in os.listdir(input_directory) if f.endswith(".stl")]
-        for filename in files:
-            input_path = os.path.join(input_directory, filename)
-            relative_path = os.path.relpath(input_path, input_directory)
-            output_path = os.path.join(output_directory, relative_path)
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            base_filename, ext = os.path.splitext(filename)
-            if prepend_str is not None:
-                base_filename = prepend_str + base_filename
-            if append_str is not None:
-                base_filename = base_filename + append_str
-            new_output_path = os.path.join(os.path.dirname(output_path), base_filename + ext)
-
-            bpy.ops.object.select_all(action='DESELECT')
-            bpy.ops.object.select_by_type(type='MESH')
-            bpy.ops.object.delete()
-            bpy.ops.import_mesh.stl(filepath=input_path)
-            if bpy.context.selected_objects:
-                obj = bpy.context.selected_objects[0]
-
-                # Apply the modifications
-                if use_blender:
-                    if decimation_ratio is not None:
-                        bpy.ops.object.modifier_add(type='DECIMATE')
-                        bpy.context.object.modifiers["Decimate"].ratio = decimation_ratio
-                    if resize_factor is not None:
-                        bpy.ops.transform.resize(value=(resize_factor, resize_factor, resize_factor))
-                    bpy.ops.object.convert(target='MESH')
-
-                # Compute dimensions based on the chosen method
-                if dimension_method == "obb":
-                    dimensions = get_oriented_bounding_box(obj)
-                else:
-                    dimensions = get_axis_aligned_bounding_box(obj) * (resize_factor if resize_factor is not None else 1)
-
-                dimension_lines.append(f"{filename}: {dimensions[0]:.3f}, {dimensions[1]:.3f}, {dimensions[2]:.3f}")
-
-                if use_blender:
-                    process_stl(input_path, new_output_path, decimation_ratio, resize_factor)
-                else:
-                    shutil.copy(input_path, new_output_path)
-
-    if dimensions_flag and dimension_lines:
-        dimensions_file_path = os.path.join(output_directory, "dimensions.txt")
-        with open(dimensions_file_path, 'w') as f:
-            f.write("\n".join(dimension_lines))
+        obj = import_stl(input_path, decimation_ratio, resize_factor)
+        if obj is None:
+            return None
+
+        # Compute dimensions based on the chosen method
+        if dimension_method == "obb":
+            dimensions = get_oriented_bounding_box(obj)
+        elif dimension_method is not None:
+            dimensions = get_axis_aligned_bounding_box(obj) * (resize_factor if resize_factor is not None else 1)
+
+        # The modified mesh is already loaded, so export it directly instead of importing it again
+        export_stl(obj, output_path, write)
+
+    if dimensions is None:
+        return None
+    return format_dimensions(filename, dimensions)
+
+
+def copy_or_resize(input_path, output_path, verts, resize_factor, write=None):
+    # Resizing doesn't need Blender or its export operator: scale the triangles in place and write them out
+    if resize_factor is None:
+        shutil.copy(input_path, output_path)
+    else:
+        verts *= resize_factor
+        (write or write_stl)(output_path, verts.reshape(-1, 3, 3))
+
+
+def format_dimensions(filename, dimensions):
+    return f"{filename}: {dimensions[0]:.3f}, {dimensions[1]:.3f}, {dimensions[2]:.3f}"
+
+
+def process_batch(tasks, decimation_ratio, resize_factor, dimension_method):
+    # Each worker handles a whole chunk so Blender startup is paid once per process, not per file.
+    # A reader thread pulls the next inputs into the page cache and a writer thread saves finished meshes,
+    # so disk I/O overlaps with the work on the current file.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as reader, \
+            concurrent.futures.ThreadPoolExecutor(max_workers=1) as writer:
+        prefetches = collections.deque(reader.submit(prefetch_file, input_path) for input_path, _ in tasks[:PREFETCH_DEPTH])
+        pending_writes = collections.deque()
+
+        def queue_write(path, triangles):
+            # Bound how many finished meshes are held in memory while the disk catches up
+            while len(pending_writes) >= WRITE_QUEUE_DEPTH:
+                pending_writes.popleft().result()
+            pending_writes.append(writer.submit(write_stl, path, triangles))
+
+        for i, (input_path, output_path) in enumerate(tasks):
+            prefetches.popleft().result()
+            if i + PREFETCH_DEPTH < len(tasks):
+                prefetches.append(reader.submit(prefetch_file, tasks[i + PREFETCH_DEPTH][0]))
+
+            line = process_file(input_path, output_path, decimation_ratio, resize_factor, dimension_method, queue_write)
+            if line is not None:
+                yield line
+
+        while pending_writes:
+            pending_writes.popleft().result()
+
+
+def get_batched_oriented_bounding_boxes(tasks, resize_factor=None):
+    # Batched OBB computation for one chunk, run inside the worker so only the formatted lines travel back.
+    # Meshes are gathered in groups of OBB_GROUP_SIZE, so memory stays bounded by one group however
+    # large the chunk is.
+    meshes = []
+    for input_path, output_path in tasks:
+        verts = read_stl_vertices(input_path)
+        if len(verts) == 0:
+            continue
+        copy_or_resize(input_path, output_path, verts, resize_factor)
+
+        # Blender's importer merges duplicate vertices, so do the same to keep the covariance unchanged
+        verts = np.unique(verts, axis=0)
+
+        centered = verts - verts.mean(axis=0)
+        cov_matrix = (centered.T @ centered).astype(np.float64) / (len(verts) - 1)
+        meshes.append((os.path.basename(input_path), verts, cov_matrix))
+        if len(meshes) == OBB_GROUP_SIZE:
+            yield from measure_oriented_bounding_boxes(meshes)
+            meshes = []
+
+    if meshes:
+        yield from measure_oriented_bounding_boxes(meshes)
+
+
+def measure_oriented_bounding_boxes(meshes):
+    # Decompose every covariance matrix in the group with one stacked eigh call instead of one call per mesh
+    _, eigvecs = np.linalg.eigh(np.stack([cov_matrix for _, _, cov_matrix in meshes]))
+
+    # Rotate each mesh into its principal frame and measure it
+    for (filename, verts, _), vecs in zip(meshes, eigvecs):
+        # eigh sorts eigenvalues in ascending order, so reverse the columns to match get_oriented_bounding_box
+        rotated_verts = verts @ vecs[:, ::-1].astype(np.float32)
+        dimensions = np.ptp(rotated_verts, axis=0)
+        yield format_dimensions(filename, dimensions)
+
+
+def create_output_directories(tasks):
+    # Create each destination directory once up front rather than calling makedirs for every file
+    for directory in {os.path.dirname(output_path) for _, output_path in tasks}:
+        os.makedirs(directory, exist_ok=True)
+
+
+def copy_files(tasks):
+    # Copies are I/O bound, so a thread pool keeps the disk busy without starting Blender
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        list(executor.map(lambda task: shutil.copyfile(*task), tasks))
+
+
+def split_into_chunks(items, count):
+    # Contiguous chunks keep the output order stable when the results are joined back together
+    size, remainder = divmod(len(items), count)
+    chunks = []
+    start = 0
+    for i in range(count):
+        end = start + size + (1 if i < remainder else 0)
+        if end > start:
+            chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+def run_worker(worker, tasks):
+    # Generators can't be sent back from a pool worker, so collect the chunk's results there
+    return list(worker(tasks))
+
+
+def run_batches(worker, tasks, jobs):
+    # Yields the worker's results in task order as they become available. Only used for the bpy-free NumPy
+    # paths: a pool child runs sys.executable, which under Blender is its bundled Python without bpy.
+    jobs = max(1, min(jobs, len(tasks)))
+    if jobs == 1:
+        yield from worker(tasks)
+        return
+
+    with multiprocessing.get_context("spawn").Pool(jobs) as pool:
+        for results in pool.imap(functools.partial(run_worker, worker), split_into_chunks(tasks, jobs)):
+            yield from results
+
+
+def get_blender_binary():
+    # Run under plain Python the parent only launches workers, so bpy may not be installed at all
+    try:
+        import bpy
+    except ImportError:
+        return "blender"
+
+    # Under Blender this is the running executable; the standalone bpy module leaves it empty
+    return bpy.app.binary_path or "blender"
+
+
+def run_blender_workers(tasks, jobs, output_directory, decimation_ratio, resize_factor, dimension_method):
+    # Each chunk is written to a manifest and handed to its own background Blender process, so Blender
+    # starts once per chunk. Yields the dimension lines in task order once every worker has finished.
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        processes = []
+        dimensions_paths = []
+        for i, chunk in enumerate(split_into_chunks(tasks, jobs)):
+            manifest_path = os.path.join(tmp_dir, f"chunk{i}.txt")
+            dimensions_path = os.path.join(tmp_dir, f"dimensions{i}.txt")
+            write_manifest(manifest_path, chunk)
+
+            command = [get_blender_binary(), "--background", "--python-exit-code", "1",
+                       "--python", os.path.abspath(__file__), "--",
+                       "--manifest", manifest_path, "--output", output_directory,
+                       "--decimation-ratio", str(decimation_ratio)]
+            if resize_factor is not None:
+                command += ["--resize", str(resize_factor)]
+            if dimension_method is not None:
+                command += ["--dimensions", "--dimension-method", dimension_method, "--dimensions-file", dimensions_path]
+            processes.append(subprocess.Popen(command))
+            dimensions_paths.append(dimensions_path)
+
+        for process in processes:
+            process.wait()
+        for process in processes:
+            if process.returncode != 0:
+                raise subprocess.CalledProcessError(process.returncode, process.args)
+
+        for dimensions_path in dimensions_paths:
+            if os.path.exists(dimensions_path):
+                with open(dimensions_path) as f:
+                    for line in f:
+                        yield line.rstrip("\n")
+
+
+def get_tasks(input_directory, output_directory, prepend_str, append_str, recursive):
+    return [(input_path, get_output_path(input_path, input_directory, output_directory, prepend_str, append_str))
+            for input_path in iter_stl_files(input_directory, recursive)]
+
+
+def read_manifest(manifest_path):
+    # One "input<TAB>output" pair per line, so a whole batch can be run by a single Blender process
+    tasks = []
+    with open(manifest_path) as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.rstrip("\r\n")
+            if not line:
+                continue
+            fields = line.split("\t", 1)
+            if len(fields) != 2 or not fields[0] or not fields[1]:
+                raise ValueError(f"{manifest_path}:{line_number}: expected an input and an output path separated by a tab")
+            tasks.append((fields[0], fields[1]))
+    return tasks
+
+
+def write_manifest(manifest_path, tasks):
+    with open(manifest_path, 'w') as f:
+        f.writelines(f"{input_path}\t{output_path}\n" for input_path, output_path in tasks)
+
+
+def process_and_write_dimensions(input_directory, output_directory, decimation_ratio, resize_factor, prepend_str, append_str, recursive, dimensions_flag, dimension_method, jobs=1, dimensions_file_path=None):
+    tasks = get_tasks(input_directory, output_directory, prepend_str, append_str, recursive)
+    process_tasks(tasks, output_directory, decimation_ratio, resize_factor, dimensions_flag, dimension_method, jobs, dimensions_file_path)
+
+
+def process_tasks(tasks, output_directory, decimation_ratio, resize_factor, dimensions_flag, dimension_method, jobs=1, dimensions_file_path=None):
+    create_output_directories(tasks)
+
+    if decimation_ratio is None and resize_factor is None and not dimensions_flag:
+        copy_files(tasks)
+        print("Done.")
+        return
+
+    # Only decimation needs Blender; resizing and measuring are done on the triangles with NumPy
+    use_blender = decimation_ratio is not None
+    measure = dimension_method if dimensions_flag else None
+    jobs = max(1, min(jobs, len(tasks)))
+    if use_blender and jobs > 1:
+        dimension_lines = run_blender_workers(tasks, jobs, output_directory, decimation_ratio, resize_factor, measure)
+    elif use_blender:
+        setup_blender()
+        dimension_lines = process_batch(tasks, decimation_ratio, resize_factor, measure)
+    elif measure == "obb":
+        # Meshes read with NumPy let the eigendecompositions be batched
+        worker = functools.partial(get_batched_oriented_bounding_boxes, resize_factor=resize_factor)
+        dimension_lines = run_batches(worker, tasks, jobs)
+    else:
+        worker = functools.partial(process_batch, decimation_ratio=decimation_ratio, resize_factor=resize_factor, dimension_method=measure)
+        dimension_lines = run_batches(worker, tasks, jobs)
+
+    if dimensions_flag:
+        if dimensions_file_path is None:
+            dimensions_file_path = os.path.join(output_directory, "dimensions.txt")
+
+        # Write the lines as they arrive through one large buffer instead of holding them all in memory.
+        # The file is only created once the first line exists, so a run with no meshes leaves no file.
+        dimension_lines = iter(dimension_lines)
+        first_line = next(dimension_lines, None)
+        if first_line is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(dimensions_file_path)), exist_ok=True)
+            with open(dimensions_file_path, 'w', buffering=WRITE_BUFFER_SIZE) as f:
+                f.write(first_line)
+                for line in dimension_lines:
+                    f.write("\n" + line)
+    else:
+        # The files are processed as the generator is consumed, so it must be drained even with nothing to write
+        collections.deque(dimension_lines, maxlen=0)
 
     print("Done.")
 
@@ -176,8 +629,14 @@ def parse_args():
     parser.add_argument("-r", "--recursive", action="store_true", help="Recursively process all STL files in child directories.")
     parser.add_argument("--dimensions", action="store_true", help="Output a .txt file with the dimensions of each model.")
     parser.add_argument("--dimension-method", choices=["obb", "axis-aligned"], default="axis-aligned", help="Method to compute dimensions: 'obb' (Oriented Bounding Box) or 'axis-aligned' (Axis-Aligned Bounding Box).")
+    parser.add_argument("-m", "--manifest", help="Process the input/output pairs listed in this file (one tab-separated pair per line) instead of scanning the input directory.")
+    parser.add_argument("--write-manifest", help="Write the input/output pairs that would be processed to this file and exit, for use with --manifest.")
+    parser.add_argument("--dimensions-file", help="Write the dimensions to this file instead of dimensions.txt in the output directory.")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of worker processes used to process STL files in parallel. Decimation runs one background Blender process per worker.")
 
-    return parser.parse_args()
+    # When run through "blender --background --python decimate.py -- ...", only the arguments after "--" are ours
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
     args = parse_args()
@@ -186,4 +645,9 @@ if __name__ == "__main__":
     if args.input is None:
         args.input = os.getcwd()
 
-    process_and_write_dimensions(args.input, args.output, args.decimation_ratio, args.resize, args.prepend, args.append, args.recursive, args.dimensions, args.dimension_method)
+    if args.write_manifest is not None:
+        write_manifest(args.write_manifest, get_tasks(args.input, args.output, args.prepend, args.append, args.recursive))
+    elif args.manifest is not None:
+        process_tasks(read_manifest(args.manifest), args.output, args.decimation_ratio, args.resize, args.dimensions, args.dimension_method, args.jobs, args.dimensions_file)
+    else:
+        process_and_write_dimensions(args.input, args.output, args.decimation_ratio, args.resize, args.prepend, args.append, args.recursive, args.dimensions, args.dimension_method, args.jobs, args.dimensions_file)